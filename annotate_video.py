@@ -7,7 +7,7 @@ import os
 import time
 from ultralytics import YOLO
 from annotation import annotate_frame
-from yellow_event_logger import YellowGasEventLogger
+from yellow_event_logger import YellowGasEventLogger, thresholds_from_env
 from matplotlib import pyplot as plt
 from camera_motion_detector import CameraMotionDetector
 
@@ -71,7 +71,7 @@ def main(input_path, model_path, output_path=None):
     # Load
     model = YOLO(model_path)
     tracker = SimpleTracker(iou_threshold=0.3, max_lost=5)
-    logger  = YellowGasEventLogger()
+    logger  = YellowGasEventLogger(**thresholds_from_env())
 
     cap = cv2.VideoCapture(input_path)
     if not cap.isOpened():
@@ -108,7 +108,9 @@ def main(input_path, model_path, output_path=None):
         min_inliers=30
     )
 
+    # log in video time (anchored at start), so dwell thresholds are seconds of footage
     start_time = time.time()
+    now_ms = 0.0
 
     try:
         while True:
@@ -126,7 +128,7 @@ def main(input_path, model_path, output_path=None):
             last_ms = now_ms
 
             # 1) Detect chimneys + ROIs + yellow flags
-            boxes, rois, yellow_flags = annotate_frame(frame, model)
+            boxes, rois, yellow_flags, yellow_fracs = annotate_frame(frame, model)
             # returns lists of equal length
 
             # 2) Track
@@ -140,12 +142,12 @@ def main(input_path, model_path, output_path=None):
 
 
             yellow_map = {}
-            for idx, flag in enumerate(yellow_flags, start=1):
+            for idx, frac in enumerate(yellow_fracs, start=1):
                 tid = det_to_tid.get(tuple(boxes[idx-1]), idx)
-                yellow_map[tid] = flag
+                yellow_map[tid] = frac
 
             # 3) log any starts/ends
-            ts = time.time() - start_time
+            ts = start_time + now_ms / 1000
             logger.update(yellow_map, timestamp=ts)
 
             # 4) Draw each detection once
@@ -182,7 +184,7 @@ def main(input_path, model_path, output_path=None):
     except KeyboardInterrupt:
         print("Interrupted.")
     finally:
-        logger.close_all(timestamp=time.time()-start_time)
+        logger.close_all(timestamp=start_time + now_ms / 1000)
         cap.release()
         if writer:
             writer.release()
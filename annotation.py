@@ -5,6 +5,8 @@ from ultralytics import YOLO
 # Tweak these thresholds
 CONF_THRESH = 0.10
 NMS_IOU     = 0.55
+# ROI yellow fraction above which a frame is drawn as yellow
+YELLOW_FRAC = 0.01
 
 _model = None
 def annotate_frame(frame, model_path):
@@ -17,10 +19,10 @@ def annotate_frame(frame, model_path):
     confidences = results.boxes.conf.cpu().numpy().tolist()
 
     if not boxes:
-        return [], [], []
+        return [], [], [], []
 
     H, W = frame.shape[:2]
-    rois, yellow_flags = [], []
+    rois, yellow_flags, yellow_fracs = [], [], []
 
     for (x1, y1, x2, y2), conf in zip(boxes, confidences):
         w = x2 - x1
@@ -36,13 +38,15 @@ def annotate_frame(frame, model_path):
         rois.append([sx1, sy1, sx2, sy2])
 
         roi = frame[sy1:sy2, sx1:sx2]
-        yellow = False
+        frac, yellow = 0.0, False
         if roi.size:
             hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
             mask = cv2.inRange(hsv, np.array([10,100,100]), np.array([40,255,255]))
             yp = int(cv2.countNonZero(mask))
             total = roi.shape[0] * roi.shape[1]
-            yellow = total > 0 and yp > total * 0.01
+            frac = yp / total if total > 0 else 0.0
+            yellow = total > 0 and yp > total * YELLOW_FRAC
         yellow_flags.append(yellow)
+        yellow_fracs.append(frac)
 
-    return boxes, rois, yellow_flags
+    return boxes, rois, yellow_flags, yellow_fracs
@@ -16,7 +16,7 @@ from ultralytics import YOLO
 from annotation import annotate_frame
 from camera_motion_detector import CameraMotionDetector
 from annotate_video import SimpleTracker     # your tracker from annotate_video.py
-from yellow_event_logger import YellowGasEventLogger
+from yellow_event_logger import YellowGasEventLogger, thresholds_from_env
 from db_utils import get_db_collection
 
 # ─── Configuration ─────────────────────────────────────────────────
@@ -34,9 +34,6 @@ processors   = {}
 # session_id → frame queue
 frame_queues = {}
 
-# one global logger for all sessions (uses chimney IDs internally)
-logger = YellowGasEventLogger()
-
 # ─── Helpers ────────────────────────────────────────────────────────
 
 def allowed_file(filename):
@@ -52,31 +49,39 @@ def process_video(session_id, filepath):
     tracker = SimpleTracker()
     motion  = CameraMotionDetector()
     cap     = cv2.VideoCapture(filepath)
+    # per-session logger: track IDs and dwell timers are local to this video
+    logger  = YellowGasEventLogger(**thresholds_from_env())
 
     q = frame_queues[session_id]
     last_ms    = -1000
+    now_ms     = 0.0
+    # event timestamps follow video time (anchored at upload time), not
+    # processing time, so the logger's dwell thresholds mean seconds of footage
     pipeline_start = time.time()
 
     while not processors[session_id].is_set():
         ret, frame = cap.read()
         if not ret:
             break
+        now_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
 
         # 1) check camera motion
         if motion.is_camera_moved(frame):
             # reset tracker & logger on camera shift
             tracker = SimpleTracker()
-            logger.close_all(timestamp=time.time() - pipeline_start)
+            try:
+                logger.close_all(timestamp=pipeline_start + now_ms / 1000)
+            except Exception as e:
+                print(f"[LOGGER ERROR] {e}")
             continue
 
         # 2) throttle to ~1 FPS
-        now_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
         if now_ms - last_ms < 1000:
             continue
         last_ms = now_ms
 
         # 3) detect + ROI + yellow
-        boxes, rois, yellow_flags = annotate_frame(frame, model_path)
+        boxes, rois, yellow_flags, yellow_fracs = annotate_frame(frame, model_path)
 
         # 4) track to assign persistent IDs
         tracks = tracker.update(boxes)
@@ -84,14 +89,13 @@ def process_video(session_id, filepath):
 
         # 5) log to MongoDB
         yellow_map = {}
-        elapsed = time.time() - pipeline_start
-        for idx, flag in enumerate(yellow_flags):
+        video_ts = pipeline_start + now_ms / 1000
+        for idx, frac in enumerate(yellow_fracs):
             tid = det_to_tid.get(tuple(boxes[idx]), idx+1)
-            yellow_map[tid] = flag
-        # logger.update(yellow_map, timestamp=elapsed)
+            yellow_map[tid] = frac
 
         try:
-            logger.update(yellow_map, timestamp=elapsed)
+            logger.update(yellow_map, timestamp=video_ts)
         except Exception as e:
             # ensure a DB error doesn’t kill the streaming thread
             print(f"[LOGGER ERROR] {e}")
@@ -125,12 +129,27 @@ def process_video(session_id, filepath):
 
     # cleanup when video ends or stop flag set
     cap.release()
-    logger.close_all(timestamp=time.time() - pipeline_start)
+    try:
+        logger.close_all(timestamp=pipeline_start + now_ms / 1000)
+    except Exception as e:
+        print(f"[LOGGER ERROR] {e}")
     processors.pop(session_id, None)
     frame_queues.pop(session_id, None)
     try: os.remove(filepath)
     except: pass
 
+def fetch_summary(days):
+    """
+    Per-chimney daily totals from 'yellow_gas_summary' for the last `days` days.
+    """
+    coll = get_db_collection().database["yellow_gas_summary"]
+    cutoff = (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d")
+    docs = coll.find({"day": {"$gte": cutoff}}).sort([("day", -1), ("chimney_number", 1)])
+    return [
+        {"chimney_number": d["chimney_number"], "day": d["day"], "total_duration": d["total_duration"]}
+        for d in docs
+    ]
+
 # ─── Endpoints ──────────────────────────────────────────────────────
 
 @app.route("/api/upload", methods=["POST"])
@@ -175,14 +194,7 @@ def video_feed(session_id):
 @app.route("/api/summary")
 def summary():
     days = int(request.args.get("last_days", 30))
-    coll = get_db_collection().database["yellow_gas_summary"]
-    cutoff = (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d")
-    docs = coll.find({"day": {"$gte": cutoff}}).sort([("day", -1), ("chimney_number", 1)])
-    out = [
-        {"chimney_number": d["chimney_number"], "day": d["day"], "total_duration": d["total_duration"]}
-        for d in docs
-    ]
-    return jsonify(out)
+    return jsonify(fetch_summary(days))
 
 # serve your three static HTML pages
 @app.route("/", defaults={"path": ""})
@@ -0,0 +1,103 @@
+# asgi_app.py
+
+import os
+import uuid
+import asyncio
+from threading import Thread, Event
+
+from quart import Quart, request, jsonify, send_from_directory, Response
+from werkzeug.utils import secure_filename
+
+# worker and session maps are shared with the Flask app
+from app import (
+    UPLOAD_FOLDER, processors, frame_queues,
+    allowed_file, process_video, fetch_summary,
+)
+from frame_bridge import AsyncFrameBridge
+
+# ─── Configuration ─────────────────────────────────────────────────
+
+app = Quart(__name__, static_folder="static", static_url_path="")
+app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+# Quart caps bodies at 16 MB and 60 s by default; match Flask's unlimited uploads
+app.config["MAX_CONTENT_LENGTH"] = None
+app.config["BODY_TIMEOUT"]       = None
+
+# ─── Helpers ────────────────────────────────────────────────────────
+
+def run_worker(session_id, filepath, bridge):
+    """
+    Runs process_video in its thread, then closes the bridge so open
+    streams end right away instead of waiting out their timeout.
+    """
+    try:
+        process_video(session_id, filepath)
+    finally:
+        bridge.close()
+
+# ─── Endpoints ──────────────────────────────────────────────────────
+
+@app.route("/api/upload", methods=["POST"])
+async def upload():
+    files = await request.files
+    file = files.get("video")
+    if not file or not allowed_file(file.filename):
+        return jsonify(error="Invalid file"), 400
+
+    session_id = uuid.uuid4().hex
+    filename   = secure_filename(f"{session_id}.mp4")
+    path       = os.path.join(app.config["UPLOAD_FOLDER"], filename)
+    await file.save(path)
+
+    # spawn processing thread, frames come back through the bridge
+    bridge = AsyncFrameBridge(asyncio.get_running_loop())
+    processors[session_id]   = Event()
+    frame_queues[session_id] = bridge
+    Thread(target=run_worker, args=(session_id, path, bridge), daemon=True).start()
+
+    return jsonify(session_id=session_id)
+
+@app.route('/video_feed/<session_id>')
+async def video_feed(session_id):
+    """
+    MJPEG stream of annotated frames for this session.
+    """
+    bridge = frame_queues.get(session_id)
+    if bridge is None:
+        return "Session not found", 404
+
+    async def gen():
+        async for jpg in bridge.frames(timeout=5):
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + jpg + b'\r\n')
+    resp = Response(gen(),
+                    mimetype='multipart/x-mixed-replace; boundary=frame')
+    # streams live as long as the video, not Quart's default response timeout
+    resp.timeout = None
+    return resp
+
+@app.route("/api/summary")
+async def summary():
+    days = int(request.args.get("last_days", 30))
+    # pymongo is blocking, keep it off the event loop
+    return jsonify(await asyncio.to_thread(fetch_summary, days))
+
+# serve your three static HTML pages
+@app.route("/", defaults={"path": ""})
+@app.route("/<path:path>")
+async def serve(path):
+    if path and os.path.exists(os.path.join("static", path)):
+        return await send_from_directory("static", path)
+    return await send_from_directory("static", "index.html")
+
+# ─── Run ────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    from hypercorn.asyncio import serve as hypercorn_serve
+    from hypercorn.config import Config
+
+    port = int(os.getenv("PORT", 5000))
+    config = Config()
+    config.bind = [f"0.0.0.0:{port}"]
+    print(f"▶️  Starting NOx ASGI server on http://0.0.0.0:{port}/")
+    asyncio.run(hypercorn_serve(app, config))
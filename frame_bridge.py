@@ -0,0 +1,76 @@
+# frame_bridge.py
+
+import asyncio
+import threading
+
+class AsyncFrameBridge:
+    """
+    Hands JPEG frames from a processing thread to any number of asyncio
+    stream consumers. Only the latest frame is kept, so a slow viewer skips
+    frames instead of stalling the worker or the other viewers.
+
+    Exposes the same full()/put() calls process_video uses on its Queue,
+    so the worker can feed either one unchanged.
+    """
+
+    def __init__(self, loop):
+        self._loop   = loop
+        self._lock   = threading.Lock()
+        self._frame  = None
+        self._seq    = 0
+        self._closed = False
+        self._ready  = asyncio.Event()
+
+    # ─── producer side (worker thread) ──────────────────────────────
+
+    def full(self):
+        return False
+
+    def put(self, jpg):
+        with self._lock:
+            if self._closed:
+                return
+            self._frame = jpg
+            self._seq  += 1
+        self._wake()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._loop.call_soon_threadsafe(self._notify)
+        except RuntimeError:
+            # event loop already shut down, nobody left to wake
+            pass
+
+    def _notify(self):
+        # runs on the loop: release everyone waiting on the old event
+        ready, self._ready = self._ready, asyncio.Event()
+        ready.set()
+
+    # ─── consumer side (event loop) ─────────────────────────────────
+
+    async def frames(self, timeout=5):
+        """
+        Async generator of JPEG bytes. Ends when the worker closes the bridge
+        or no new frame arrives within `timeout` seconds.
+        """
+        last = 0
+        while True:
+            # grab the event before checking seq so a put() in between still wakes us
+            ready = self._ready
+            with self._lock:
+                seq, jpg, closed = self._seq, self._frame, self._closed
+            if seq != last:
+                last = seq
+                yield jpg
+                continue
+            if closed:
+                return
+            try:
+                await asyncio.wait_for(ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return
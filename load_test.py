@@ -0,0 +1,186 @@
+# load_test.py
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+
+BOUNDARY = b"--frame\r\n"
+
+def remaining(deadline):
+    return max(0, deadline - time.monotonic())
+
+async def http_request(host, port, method, path, body=b"", headers=None):
+    """
+    Minimal HTTP/1.1 request over a fresh connection, returns (status, body).
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    head = [f"{method} {path} HTTP/1.1", f"Host: {host}:{port}",
+            "Connection: close", f"Content-Length: {len(body)}"]
+    for k, v in (headers or {}).items():
+        head.append(f"{k}: {v}")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+
+    header, _, payload = raw.partition(b"\r\n\r\n")
+    status = parse_status(header)
+    if b"transfer-encoding: chunked" in header.lower():
+        payload = dechunk(payload)
+    return status, payload
+
+def parse_status(header):
+    """
+    Status code from a response head; ValueError if the server sent
+    nothing usable (e.g. it dropped the connection).
+    """
+    parts = header.split(b" ", 2)
+    if len(parts) < 2 or not parts[0].startswith(b"HTTP/") or not parts[1].isdigit():
+        raise ValueError(f"malformed response {header[:60]!r}")
+    return int(parts[1])
+
+def dechunk(data):
+    out, pos = b"", 0
+    while True:
+        end = data.index(b"\r\n", pos)
+        size = int(data[pos:end].split(b";")[0], 16)
+        if size == 0:
+            return out
+        out += data[end+2:end+2+size]
+        pos = end + 2 + size + 2
+
+async def upload_video(host, port, video_path):
+    boundary = uuid.uuid4().hex
+    with open(video_path, "rb") as f:
+        content = f.read()
+    body = (f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="video"; filename="{os.path.basename(video_path)}"\r\n'
+            f"Content-Type: video/mp4\r\n\r\n").encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    status, payload = await http_request(
+        host, port, "POST", "/api/upload", body,
+        {"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    if status != 200:
+        raise RuntimeError(f"upload failed: {status} {payload[:200]!r}")
+    return json.loads(payload)["session_id"]
+
+async def stream_client(host, port, session_id, deadline, stats):
+    """
+    Holds one /video_feed connection open and counts MJPEG parts received.
+    """
+    frames, tail = 0, b""
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), remaining(deadline))
+        writer.write((f"GET /video_feed/{session_id} HTTP/1.1\r\n"
+                      f"Host: {host}:{port}\r\n\r\n").encode())
+        await writer.drain()
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), remaining(deadline))
+        status = parse_status(head)
+        if status != 200:
+            writer.close()
+            stats["errors"].append(f"stream: HTTP {status}")
+            stats["frames"].append(0)
+            return
+        stats["streams_open"] += 1
+        while time.monotonic() < deadline:
+            try:
+                chunk = await asyncio.wait_for(reader.read(65536), remaining(deadline))
+            except asyncio.TimeoutError:
+                break
+            if not chunk:
+                break
+            buf = tail + chunk
+            frames += buf.count(BOUNDARY)
+            tail = buf[-(len(BOUNDARY)-1):]
+        writer.close()
+    except asyncio.TimeoutError:
+        # no status line before the deadline: the server is not answering
+        stats["errors"].append("stream: timed out waiting for response")
+    except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+        stats["errors"].append(f"stream: {e!r}")
+    stats["frames"].append(frames)
+
+async def api_client(host, port, deadline, stats):
+    """
+    Polls /api/summary back-to-back until the deadline, recording latencies.
+    A request still pending at the deadline is counted as cut off; it is an
+    error only if this client never got any answer at all.
+    """
+    answered = False
+    while time.monotonic() < deadline:
+        t0 = time.monotonic()
+        try:
+            status, _ = await asyncio.wait_for(
+                http_request(host, port, "GET", "/api/summary?last_days=30"),
+                remaining(deadline))
+        except asyncio.TimeoutError:
+            stats["cut_off"] += 1
+            if not answered:
+                stats["errors"].append("api: timed out waiting for response")
+            break
+        except (OSError, ValueError) as e:
+            stats["errors"].append(f"api: {e!r}")
+            await asyncio.sleep(0.1)
+            continue
+        answered = True
+        if status != 200:
+            stats["errors"].append(f"api: HTTP {status}")
+        stats["latencies"].append(time.monotonic() - t0)
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values)-1, int(len(values) * pct / 100))]
+
+async def main(args):
+    session_id = args.session
+    if args.video:
+        session_id = await upload_video(args.host, args.port, args.video)
+        print(f"Uploaded {args.video!r} → session {session_id}")
+
+    stats = {"streams_open": 0, "frames": [], "latencies": [], "cut_off": 0, "errors": []}
+    deadline = time.monotonic() + args.duration
+    tasks = [stream_client(args.host, args.port, session_id, deadline, stats)
+             for _ in range(args.streams)]
+    tasks += [api_client(args.host, args.port, deadline, stats)
+              for _ in range(args.api)]
+    for res in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(res, Exception):
+            stats["errors"].append(f"client: {res!r}")
+
+    frames  = stats["frames"]
+    lat     = stats["latencies"]
+    starved = sum(1 for f in frames if f == 0)
+    print(f"Stream clients : {stats['streams_open']}/{args.streams} connected")
+    if frames:
+        print(f"Frames/client  : min {min(frames)}  avg {sum(frames)/len(frames):.1f}  max {max(frames)}"
+              f"  ({starved} with 0 frames)")
+    print(f"API clients    : {args.api}  ({len(lat)} requests, {len(lat)/args.duration:.1f} req/s)")
+    print(f"API latency    : p50 {percentile(lat, 50)*1000:.0f} ms  p95 {percentile(lat, 95)*1000:.0f} ms"
+          f"  ({stats['cut_off']} still in flight at deadline)")
+    print(f"Errors         : {len(stats['errors'])}")
+    for err in stats["errors"][:10]:
+        print(f"  {err}")
+    return 1 if stats["errors"] or starved else 0
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Concurrent MJPEG + API load test")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=int(os.getenv("PORT", 5000)))
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument("--video", help="mp4 to upload, then stream its session")
+    src.add_argument("--session", help="existing session id to stream")
+    p.add_argument("--streams", type=int, default=300, help="concurrent /video_feed clients")
+    p.add_argument("--api", type=int, default=100, help="concurrent /api/summary clients")
+    p.add_argument("-d", "--duration", type=float, default=30.0, help="seconds to hold the load")
+    args = p.parse_args()
+
+    if args.video and not os.path.isfile(args.video):
+        print(f"Input not found: {args.video!r}"); sys.exit(1)
+
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,113 @@
+# measure_event_churn.py
+
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import sys
+
+import cv2
+
+from annotation import annotate_frame
+from annotate_video import SimpleTracker
+from camera_motion_detector import CameraMotionDetector
+from yellow_event_logger import YellowGasEventLogger, thresholds_from_env
+
+def sample_fractions(input_path, model_path):
+    """
+    Runs motion→detect→track over the video at 1 FPS, like process_video.
+    Returns ([(ts, {tid: frac}, {tid: flag}), or (ts, None, None) on camera
+    move], duration_s), with ts in video seconds.
+    """
+    tracker = SimpleTracker()
+    motion  = CameraMotionDetector()
+    cap     = cv2.VideoCapture(input_path)
+    if not cap.isOpened():
+        print(f"Error: cannot open {input_path!r}")
+        sys.exit(1)
+
+    samples, last_ms, now_ms = [], -1000, 0.0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        now_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+
+        if motion.is_camera_moved(frame):
+            tracker = SimpleTracker()
+            samples.append((now_ms / 1000, None, None))
+            continue
+
+        if now_ms - last_ms < 1000:
+            continue
+        last_ms = now_ms
+
+        boxes, rois, yellow_flags, yellow_fracs = annotate_frame(frame, model_path)
+        tracks = tracker.update(boxes)
+        det_to_tid = { tuple(v["box"]): tid for tid, v in tracks.items() }
+
+        frac_map, flag_map = {}, {}
+        for idx, frac in enumerate(yellow_fracs):
+            tid = det_to_tid.get(tuple(boxes[idx]), idx+1)
+            frac_map[tid] = frac
+            flag_map[tid] = yellow_flags[idx]
+        samples.append((now_ms / 1000, frac_map, flag_map))
+
+    cap.release()
+    return samples, now_ms / 1000
+
+def replay(samples, duration, use_flags=False, **kwargs):
+    """
+    Feeds recorded samples (fractions, or the raw bool flags) through a
+    logger that counts instead of writing to MongoDB. Returns the logger
+    so its counters can be read.
+    """
+    ids = itertools.count(1)
+    logger = YellowGasEventLogger(insert_fn=lambda cid, ts: next(ids),
+                                  end_fn=lambda eid, ts: 1, **kwargs)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for ts, fracs, flags in samples:
+            if fracs is None:
+                logger.close_all(timestamp=ts)
+            else:
+                logger.update(flags if use_flags else fracs, timestamp=ts)
+        logger.close_all(timestamp=duration)
+    return logger
+
+def report(label, logger, duration):
+    hours = max(duration, 1e-9) / 3600
+    print(f"{label}")
+    print(f"  writes      : {logger.writes}  ({logger.writes / hours:.1f} / hour)")
+    print(f"  events      : {sum(logger.events.values())}")
+    for cid in sorted(logger.events):
+        print(f"    chimney {cid}: {logger.events[cid]}")
+
+if __name__ == "__main__":
+    env = thresholds_from_env()
+    p = argparse.ArgumentParser(description="Compare raw vs debounced event logging on recorded footage")
+    p.add_argument("input", help="video file path")
+    p.add_argument("-m","--model", default=os.getenv("YOLO_MODEL_PATH", "bestYolo12CCTV.pt"))
+    p.add_argument("--enter", type=float, default=env["enter_frac"], help="yellow fraction to turn ON")
+    p.add_argument("--exit",  type=float, default=env["exit_frac"],  help="yellow fraction to turn OFF")
+    p.add_argument("--min-on",  type=float, default=env["min_on"],  help="seconds ON before an event starts")
+    p.add_argument("--min-off", type=float, default=env["min_off"], help="seconds OFF before an event ends")
+    args = p.parse_args()
+
+    if not os.path.isfile(args.input):
+        print(f"Input not found: {args.input!r}"); sys.exit(1)
+    if not os.path.isfile(args.model):
+        print(f"Model not found: {args.model!r}"); sys.exit(1)
+
+    samples, duration = sample_fractions(args.input, args.model)
+    print(f"{len(samples)} samples over {duration:.0f} s of footage\n")
+
+    # old behaviour: annotate_frame's bool flags, every flip written immediately
+    before = replay(samples, duration, use_flags=True, enter_frac=0, exit_frac=0,
+                    min_on=0, min_off=0)
+    after  = replay(samples, duration, enter_frac=args.enter, exit_frac=args.exit,
+                    min_on=args.min_on, min_off=args.min_off)
+
+    report("Before (raw per-frame flags)", before, duration)
+    report(f"After  (enter {args.enter}, exit {args.exit}, "
+           f"min_on {args.min_on}s, min_off {args.min_off}s)", after, duration)
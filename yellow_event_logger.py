@@ -1,32 +1,194 @@
 # yellow_event_logger.py
 
+import os
 import time
-from db_utils import insert_event_start, update_event_end
+import threading
+from collections import Counter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Hysteresis on the ROI yellow fraction: a chimney turns yellow above ENTER_FRAC
+# and only turns back at or below EXIT_FRAC, so values in between keep the
+# current state. Strict ">" matches the yellow_flags rule in annotation.py.
+ENTER_FRAC = 0.02
+EXIT_FRAC  = 0.01
+# Dwell times (s): a state change must hold this long before it is logged.
+# Off-gaps shorter than MIN_OFF_S are merged into the surrounding event.
+MIN_ON_S   = 2.0
+MIN_OFF_S  = 5.0
+
+def thresholds_from_env():
+    """
+    Logger thresholds, overridable with YELLOW_ENTER_FRAC, YELLOW_EXIT_FRAC,
+    YELLOW_MIN_ON_S and YELLOW_MIN_OFF_S.
+    """
+    return {
+        "enter_frac": float(os.getenv("YELLOW_ENTER_FRAC", ENTER_FRAC)),
+        "exit_frac":  float(os.getenv("YELLOW_EXIT_FRAC",  EXIT_FRAC)),
+        "min_on":     float(os.getenv("YELLOW_MIN_ON_S",   MIN_ON_S)),
+        "min_off":    float(os.getenv("YELLOW_MIN_OFF_S",  MIN_OFF_S)),
+    }
 
 class YellowGasEventLogger:
-    def __init__(self):
-        self.active_events = {}
+    """
+    Per-chimney debounced state machine. Each chimney is settled OFF or ON
+    (with an open Mongo event); a candidate flip is tracked in `run_start`
+    and only written once it has held for the dwell time. Events are
+    back-dated to when the run started, so durations stay accurate.
+
+    Fed the bool yellow_flags from annotate_frame with zero dwell times
+    (any thresholds in [0, 1)), it reproduces the old raw per-frame logger.
+    """
+
+    def __init__(self, enter_frac=ENTER_FRAC, exit_frac=EXIT_FRAC,
+                 min_on=MIN_ON_S, min_off=MIN_OFF_S,
+                 insert_fn=None, end_fn=None):
+        self.enter_frac = enter_frac
+        self.exit_frac  = exit_frac
+        self.min_on     = min_on
+        self.min_off    = min_off
+        if insert_fn is None or end_fn is None:
+            # db_utils connects to MongoDB on import; only touch it when writing for real
+            from db_utils import insert_event_start, update_event_end
+            insert_fn = insert_fn or insert_event_start
+            end_fn    = end_fn or update_event_end
+        self.insert_fn  = insert_fn
+        self.end_fn     = end_fn
 
-    def update(self, yellow_flags: dict, timestamp: float = None):
+        # cid → {"eid": open event id or None, "run_start": ts of pending flip or None}
+        self.states = {}
+        self._lock  = threading.Lock()
+        # write / event counters for measuring DB churn
+        self.writes = 0
+        self.events = Counter()
+
+    def update(self, yellow_fracs: dict, timestamp: float = None):
+        """
+        yellow_fracs maps chimney id → yellow fraction of its ROI (bools work
+        too, as 1.0 / 0.0). Chimneys missing from the dict count as 0.
+        """
         ts = timestamp if timestamp is not None else time.time()
 
-        # start new
-        for cid, flag in yellow_flags.items():
-            if flag and cid not in self.active_events:
-                eid = insert_event_start(cid, ts)
-                self.active_events[cid] = eid
-                print(f"[LOGGER] START chimney {cid} @ {ts}")
+        with self._lock:
+            for cid in set(self.states) | set(yellow_fracs):
+                frac = float(yellow_fracs.get(cid, 0.0))
+                st = self.states.setdefault(cid, {"eid": None, "run_start": None})
+                self._step(cid, st, frac, ts)
+                if st["eid"] is None and st["run_start"] is None:
+                    del self.states[cid]
+
+    def _step(self, cid, st, frac, ts):
+        if st["eid"] is None:
+            # settled OFF: need a continuous run > enter_frac
+            if frac <= self.enter_frac:
+                st["run_start"] = None
+                return
+            if st["run_start"] is None:
+                st["run_start"] = ts
+            if ts - st["run_start"] >= self.min_on:
+                st["eid"] = self._start(cid, st["run_start"])
+                st["run_start"] = None
+        else:
+            # settled ON: need a continuous run <= exit_frac
+            if frac > self.exit_frac:
+                st["run_start"] = None   # gap too short, merge it
+                return
+            if st["run_start"] is None:
+                st["run_start"] = ts
+            if ts - st["run_start"] >= self.min_off:
+                self._end(cid, st["eid"], st["run_start"])
+                st["eid"] = None
+                st["run_start"] = None
+
+    def _start(self, cid, ts):
+        eid = self.insert_fn(cid, ts)
+        self.writes += 1
+        self.events[cid] += 1
+        print(f"[LOGGER] START chimney {cid} @ {ts}")
+        return eid
 
-        # end old
-        for cid in list(self.active_events):
-            if not yellow_flags.get(cid, False):
-                eid = self.active_events.pop(cid)
-                update_event_end(eid, ts)
-                print(f"[LOGGER] END   chimney {cid} @ {ts}")
+    def _end(self, cid, eid, ts):
+        self.end_fn(eid, ts)
+        self.writes += 1
+        print(f"[LOGGER] END   chimney {cid} @ {ts}")
 
     def close_all(self, timestamp: float = None):
         ts = timestamp if timestamp is not None else time.time()
-        for cid, eid in self.active_events.items():
-            update_event_end(eid, ts)
-            print(f"[LOGGER] FORCE-END chimney {cid} @ {ts}")
-        self.active_events.clear()
+        with self._lock:
+            states, self.states = self.states, {}
+            for cid, st in states.items():
+                if st["eid"] is None:
+                    continue   # never settled ON, nothing to close
+                # a pending off-run already marks where the emission stopped
+                end = st["run_start"] if st["run_start"] is not None else ts
+                self.end_fn(st["eid"], end)
+                self.writes += 1
+                print(f"[LOGGER] FORCE-END chimney {cid} @ {end}")
+
+if __name__ == "__main__":
+    """
+    Self-check of the state machine with in-memory writers (no MongoDB):
+        python yellow_event_logger.py
+    """
+    import contextlib
+    import io
+    import random
+
+    def run(samples, close_at, **kwargs):
+        # one open event per chimney at a time, so the chimney id doubles as event id
+        writes = []
+        logger = YellowGasEventLogger(
+            insert_fn=lambda cid, ts: writes.append(("START", cid, ts)) or cid,
+            end_fn=lambda eid, ts: writes.append(("END", eid, ts)), **kwargs)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for ts, fracs in samples:
+                logger.update(fracs, timestamp=ts)
+            logger.close_all(timestamp=close_at)
+        return writes
+
+    def old_raw(samples, close_at):
+        # the per-frame logger this class replaced
+        active, writes = set(), []
+        for ts, flags in samples:
+            for cid, flag in flags.items():
+                if flag and cid not in active:
+                    active.add(cid); writes.append(("START", cid, ts))
+            for cid in list(active):
+                if not flags.get(cid, False):
+                    active.discard(cid); writes.append(("END", cid, ts))
+        writes += [("END", cid, close_at) for cid in active]
+        return writes
+
+    def series(fracs, cid=1):
+        return [(ts, {cid: f}) for ts, f in enumerate(fracs)]
+
+    # 1) bool flags + zero dwell reproduce the old raw logger exactly
+    rng = random.Random(0)
+    samples = [(ts, {cid: rng.random() < 0.4 for cid in rng.sample(range(1, 5), rng.randint(0, 4))})
+               for ts in range(300)]
+    got = run(samples, 300, enter_frac=0, exit_frac=0, min_on=0, min_off=0)
+    assert sorted(got) == sorted(old_raw(samples, 300)), "raw equivalence"
+
+    # 2) a 3 s gap (< MIN_OFF_S) is merged into one event
+    got = run(series([0.05] * 10 + [0.0] * 3 + [0.05] * 7 + [0.0] * 10), 30)
+    assert got == [("START", 1, 0), ("END", 1, 20)], f"gap merge: {got}"
+
+    # 3) start/end are back-dated to where the ON / OFF runs began
+    got = run(series([0.0] * 4 + [0.05] * 6 + [0.0] * 8), 18)
+    assert got == [("START", 1, 4), ("END", 1, 10)], f"back-dating: {got}"
+
+    # 4) ON runs shorter than MIN_ON_S never open an event
+    got = run(series([0.05, 0.0, 0.05, 0.05, 0.0]), 5)
+    assert got == [], f"min_on: {got}"
+
+    # 5) hysteresis: a fraction between exit and enter keeps the current state
+    assert run(series([0.015] * 10), 10) == [], "no start between thresholds"
+    got = run(series([0.05] * 5 + [0.015] * 10 + [0.0] * 6), 21)
+    assert got == [("START", 1, 0), ("END", 1, 15)], f"no end between thresholds: {got}"
+
+    # 6) close_all during a pending off-run ends the event where the run began
+    got = run(series([0.05] * 5 + [0.0] * 2), 7)
+    assert got == [("START", 1, 0), ("END", 1, 5)], f"close_all pending off: {got}"
+
+    print("yellow_event_logger self-check passed")